@@ -20,29 +20,48 @@ CSV assumptions:
 - Primary table header columns contain: TOTE ID, TOTE TITLE, ITEM TITLE, ITEM DESCRIPTION, ITEM QUANTITY, QRDATA, TOTE LOCATION
 - Some exports append an "Empty ToteScan labels without items" section with a reduced header set. This script understands both.
 
-Dependencies: reportlab, qrcode (optional for QR code), pillow (used by qrcode)
+Dependencies: reportlab, qrcode or segno (optional for QR code), pillow (used by qrcode)
 """
 from __future__ import annotations
 
 import argparse
 import csv
+import functools
 import glob
 import io
+import multiprocessing
 import os
 import sys
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 
-# Try to import QR code libs; run without QR if not available
+# Try to import image/QR code libs; run without QR if not available
 try:
-    import qrcode
     from PIL import Image
 except Exception:  # pragma: no cover - optional
-    qrcode = None  # type: ignore
     Image = None  # type: ignore
 
+try:
+    import qrcode
+except Exception:  # pragma: no cover - optional
+    qrcode = None  # type: ignore
+
+# segno builds QR matrices several times faster than qrcode; preferred when installed
+try:
+    import segno
+except Exception:  # pragma: no cover - optional
+    segno = None  # type: ignore
+
+# pypdf is only needed to merge per-tote PDFs when rendering with --jobs > 1
+try:
+    from pypdf import PdfWriter
+except Exception:  # pragma: no cover - optional
+    PdfWriter = None  # type: ignore
+
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.units import inch
 from reportlab.lib import colors
@@ -76,8 +95,11 @@ EMPTY_HEADER = [
     "TOTE TITLE",
 ]
 
+# Single-cell line that introduces the "Empty" section in some exports
+EMPTY_SECTION_MARKER = "Empty ToteScan labels"
 
-@dataclass
+
+@dataclass(frozen=True)
 class ToteItem:
     title: str
     description: str = ""
@@ -95,26 +117,65 @@ class Tote:
     parent_id: Optional[str] = None
     children: List[str] = field(default_factory=list)
 
-    def add_item(self, title: str, description: str = "", quantity: Optional[int] = None, image_url: Optional[str] = None):
+    def add_item(self, title: str, description: str = "", quantity: int = 1, image_url: Optional[str] = None):
+        # Fields arrive already stripped and the quantity already parsed (see parse_quantity)
         if not title and not description:
             return
-        try:
-            qty = int(quantity) if quantity not in (None, "", " ") else 1
-        except Exception:
-            qty = 1
-        self.items.append(ToteItem(title=title.strip(), description=(description or "").strip(), quantity=qty, image_url=(image_url or None)))
+        self.items.append(ToteItem(title=title, description=description, quantity=quantity, image_url=(image_url or None)))
+
+
+def parse_quantity(raw: str) -> int:
+    # Plain digit strings (the common case) skip exception handling; blanks and junk count as 1
+    if raw.isdecimal():
+        return int(raw)
+    try:
+        return int(raw) if raw else 1
+    except ValueError:
+        return 1
+
+
+# Required header names, built once rather than per sniffed row
+_PRIMARY_REQ = frozenset(("TOTE ID", "QRDATA", "ITEM TITLE", "ITEM QUANTITY"))
+_EMPTY_REQ = frozenset(EMPTY_HEADER)
+
+
+_MIN_HEADER_LEN = min(len(PRIMARY_HEADER), len(EMPTY_HEADER))
 
 
 def sniff_headers(line: List[str]) -> str:
+    # Rows narrower than any known header cannot be one; bail before normalizing cells
+    n = len(line)
+    if n < _MIN_HEADER_LEN:
+        return "UNKNOWN"
     # Normalize by stripping quotes/spaces
-    norm = [c.strip().strip('\ufeff') for c in line]  # handle BOM if present
-    if len(norm) >= len(PRIMARY_HEADER) and all(h in norm for h in ["TOTE ID", "QRDATA", "ITEM TITLE", "ITEM QUANTITY"]):
+    norm = {c.strip().strip('\ufeff') for c in line}  # handle BOM if present
+    if n >= len(PRIMARY_HEADER) and _PRIMARY_REQ <= norm:
         return "PRIMARY"
-    if len(norm) == len(EMPTY_HEADER) and all(h in norm for h in EMPTY_HEADER):
+    if n == len(EMPTY_HEADER) and _EMPTY_REQ <= norm:
         return "EMPTY"
     return "UNKNOWN"
 
 
+def header_columns(row: List[str]) -> Tuple[int, int, int, int, Optional[int], int, int, int, int]:
+    # Column positions resolved once per header row: (tote id, tote title, location, qrdata,
+    # parent id, item title, item description, quantity, images). Missing columns fall back
+    # to 0, except PARENT TOTE ID which is None when absent.
+    pos: Dict[str, int] = {}
+    for i, name in enumerate(row):
+        pos.setdefault(name.strip().strip('\ufeff'), i)
+    return (
+        pos["TOTE ID"],
+        pos.get("TOTE TITLE", 0),
+        pos.get("TOTE LOCATION", 0),
+        pos.get("QRDATA", 0),
+        pos.get("PARENT TOTE ID"),
+        pos.get("ITEM TITLE", 0),
+        pos.get("ITEM DESCRIPTION", 0),
+        pos.get("ITEM QUANTITY", 0),
+        pos.get("IMAGES", 0),
+    )
+
+
 def read_csvs(paths: List[str]) -> Dict[str, Tote]:
     totes: Dict[str, Tote] = {}
 
@@ -124,82 +185,84 @@ def read_csvs(paths: List[str]) -> Dict[str, Tote]:
         return totes[tote_id]
 
     for path in paths:
-        with open(path, "r", encoding="utf-8") as f:
+        # Stream rows through a large read buffer; newline="" lets csv handle quoted line breaks
+        with open(path, "r", encoding="utf-8", newline="", buffering=1024 * 1024) as f:
             reader = csv.reader(f)
             current_mode = "UNKNOWN"
-            header_index: Dict[str, int] = {}
+            idx_id = 0
             for row in reader:
                 # skip completely empty lines
-                if not any(cell.strip() for cell in row):
+                if not any(map(str.strip, row)):
                     continue
 
                 # detect section switchers like the literal line: "Empty ToteScan labels without items"
-                if len(row) == 1 and "Empty ToteScan labels" in row[0]:
+                if len(row) == 1 and EMPTY_SECTION_MARKER in row[0]:
                     current_mode = "EMPTY_PENDING_HEADER"
-                    header_index = {}
                     continue
 
-                # Detect header rows
-                mode = sniff_headers(row)
-                if mode == "PRIMARY":
-                    current_mode = "PRIMARY"
-                    header_index = {name: row.index(name) for name in row}
-                    continue
-                elif mode == "EMPTY":
-                    current_mode = "EMPTY"
-                    header_index = {name: row.index(name) for name in row}
-                    continue
-                elif current_mode == "EMPTY_PENDING_HEADER":
-                    # If we were expecting an EMPTY header but sniff didn't catch, try manual match
-                    if all(h in row for h in EMPTY_HEADER):
-                        current_mode = "EMPTY"
-                        header_index = {name: row.index(name) for name in row}
+                # Once a section header is known, data rows skip header sniffing entirely;
+                # only a repeated header line (same TOTE ID cell) needs to be recognized.
+                if current_mode in ("PRIMARY", "EMPTY"):
+                    try:
+                        tote_id = row[idx_id]
+                    except Exception:
                         continue
+                    if tote_id.strip().strip('\ufeff') == "TOTE ID":
+                        current_mode = sniff_headers(row)
+                        if current_mode != "UNKNOWN":
+                            (idx_id, idx_title, idx_loc, idx_qr, idx_parent,
+                             idx_item_title, idx_item_desc, idx_qty, idx_img) = header_columns(row)
+                        continue
+                else:
+                    # Detect header rows
+                    mode = sniff_headers(row)
+                    if mode == "UNKNOWN" and current_mode == "EMPTY_PENDING_HEADER":
+                        # If we were expecting an EMPTY header but sniff didn't catch, try manual match
+                        if all(h in row for h in EMPTY_HEADER):
+                            mode = "EMPTY"
+                    if mode != "UNKNOWN":
+                        current_mode = mode
+                        (idx_id, idx_title, idx_loc, idx_qr, idx_parent,
+                         idx_item_title, idx_item_desc, idx_qty, idx_img) = header_columns(row)
+                    # Rows outside a known section are ignored
+                    continue
 
                 # Process data rows
                 if current_mode == "PRIMARY":
-                    try:
-                        tote_id = row[header_index.get("TOTE ID")]
-                    except Exception:
-                        continue
                     tote = get_or_create(tote_id)
-                    tote.title = tote.title or row[header_index.get("TOTE TITLE", 0)].strip()
-                    tote.location = tote.location or row[header_index.get("TOTE LOCATION", 0)].strip()
-                    tote.qrdata = tote.qrdata or row[header_index.get("QRDATA", 0)].strip() or None
+                    tote.title = tote.title or row[idx_title].strip()
+                    tote.location = tote.location or row[idx_loc].strip()
+                    tote.qrdata = tote.qrdata or row[idx_qr].strip() or None
                     # Parent tote id, if present
                     try:
-                        p_id = row[header_index.get("PARENT TOTE ID", -1)].strip() if header_index.get("PARENT TOTE ID") is not None else ""
+                        p_id = row[idx_parent].strip() if idx_parent is not None else ""
                     except Exception:
                         p_id = ""
                     if p_id:
                         tote.parent_id = p_id
-                    item_title = row[header_index.get("ITEM TITLE", 0)].strip()
-                    item_desc = row[header_index.get("ITEM DESCRIPTION", 0)].strip()
-                    qty_raw = row[header_index.get("ITEM QUANTITY", 0)].strip()
-                    images_field = row[header_index.get("IMAGES", 0)].strip()
+                    item_title = row[idx_item_title].strip()
+                    item_desc = row[idx_item_desc].strip()
+                    qty = parse_quantity(row[idx_qty].strip())
+                    images_field = row[idx_img].strip()
                     first_image = None
                     if images_field:
-                        # IMAGES may contain multiple URLs separated by whitespace
-                        parts = [p for p in images_field.split() if p.startswith("http")]
-                        if parts:
-                            first_image = parts[0]
-                    tote.add_item(item_title, item_desc, qty_raw, first_image)
-                elif current_mode == "EMPTY":
-                    # Omit empty totes from output list: only update existing totes (do not create new ones)
-                    try:
-                        tote_id = row[header_index.get("TOTE ID")]
-                    except Exception:
-                        continue
+                        # IMAGES may contain multiple URLs separated by whitespace; only split
+                        # off the first token, and scan the rest only if it is not a URL
+                        head = images_field.split(None, 1)[0]
+                        if head.startswith("http"):
+                            first_image = head
+                        else:
+                            first_image = next((p for p in images_field.split() if p.startswith("http")), None)
+                    tote.add_item(item_title, item_desc, qty, first_image)
+                else:
+                    # EMPTY section: omit empty totes from output list, only update existing totes (do not create new ones)
                     tote = totes.get(tote_id)
                     if not tote:
                         # Skip creating a tote based solely on the EMPTY section
                         continue
-                    tote.title = tote.title or row[header_index.get("TOTE TITLE", 0)].strip()
-                    tote.location = tote.location or row[header_index.get("TOTE LOCATION", 0)].strip()
+                    tote.title = tote.title or row[idx_title].strip()
+                    tote.location = tote.location or row[idx_loc].strip()
                     # No items to add in this section
-                else:
-                    # Unknown content, ignore
-                    continue
 
     # Build parent->children links
     for t in list(totes.values()):
@@ -232,14 +295,27 @@ def try_register_fonts():  # pragma: no cover - rendering nicety
 
 
 def make_qr_image(data: str, box_size: int = 6, border: int = 2) -> Optional[Image.Image]:  # type: ignore[name-defined]
-    if not qrcode or not Image:
+    if not Image:
         return None
+    if segno is not None:
+        # make_qr: always a regular QR code (segno.make may pick a Micro QR for short data)
+        qr = segno.make_qr(data, error="m")
+        # Rasterize the module matrix directly (1px per module, nearest-neighbour upscale)
+        # rather than encoding a PNG into a scratch buffer and decoding it again
+        n = qr.symbol_size(scale=1, border=border)[0]
+        modules = bytes(0 if dark else 255 for row in qr.matrix_iter(scale=1, border=border) for dark in row)
+        # Greyscale is enough for a black/white code (1 byte/pixel instead of 3 for RGB)
+        return Image.frombytes("L", (n, n), modules).resize((n * box_size, n * box_size), Image.Resampling.NEAREST)
+    if not qrcode:
+        return None
+    # qrcode (>= 7.4) already reuses precomputed blank matrices per version internally
     qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=box_size, border=border)
     qr.add_data(data)
     qr.make(fit=True)
     img = qr.make_image(fill_color="black", back_color="white")
     if hasattr(img, "convert"):
-        return img.convert("RGB")
+        # 1-bit -> greyscale, which ReportLab embeds as-is (RGB would triple the size)
+        return img.convert("L")
     return None
 
 
@@ -247,38 +323,45 @@ def make_qr_image(data: str, box_size: int = 6, border: int = 2) -> Optional[Ima
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache", "images")
 
 
+# One pooled HTTP session shared by all downloads (including prefetch worker threads)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
 def _hash(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()
 
 
-def fetch_thumbnail(url: str, thumb_px: int = 128) -> Optional[Image.Image]:  # type: ignore[name-defined]
-    if not Image:
-        return None
+def _thumb_path(url: str, thumb_px: int) -> str:
+    return os.path.join(CACHE_DIR, f"{_hash(url)}_{thumb_px}.webp")
+
+
+def _download_thumbnail(url: str, thumb_px: int) -> Optional[Image.Image]:  # type: ignore[name-defined]
+    # Download, shrink and store in the disk cache; returns the thumbnail (even if saving failed)
     os.makedirs(CACHE_DIR, exist_ok=True)
-    key = _hash(url)
-    thumb_path = os.path.join(CACHE_DIR, f"{key}_{thumb_px}.png")
-    # Return cached thumbnail if present
-    if os.path.exists(thumb_path):
-        try:
-            return Image.open(thumb_path).convert("RGB")
-        except Exception:
-            try:
-                os.remove(thumb_path)
-            except Exception:
-                pass
-    # Download
     try:
-        resp = requests.get(url, timeout=10)
+        resp = _SESSION.get(url, timeout=10)
         resp.raise_for_status()
         img = Image.open(io.BytesIO(resp.content))
+        # Let the JPEG decoder downscale while decoding (no-op for other formats)
+        img.draft("RGB", (thumb_px, thumb_px))
         if img.mode not in ("RGB", "RGBA"):
             img = img.convert("RGB")
-        # Create thumbnail while preserving aspect ratio
-        img_copy = img.copy()
-        img_copy.thumbnail((thumb_px, thumb_px))
-        # Save to cache
+        # Create thumbnail while preserving aspect ratio (never upscale). Bilinear is plenty
+        # for 0.7in print thumbnails and is much faster than the default bicubic, especially
+        # with the optional pillow-simd drop-in.
+        ratio = min(thumb_px / img.width, thumb_px / img.height, 1.0)
+        size = (max(1, int(img.width * ratio)), max(1, int(img.height * ratio)))
+        img_copy = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0) if ratio < 1.0 else img.copy()
+        if img_copy.mode == "RGBA":
+            # Flatten transparency onto white once, so cached thumbnails are plain RGB
+            flat = Image.new("RGB", img_copy.size, (255, 255, 255))
+            flat.paste(img_copy, mask=img_copy.getchannel("A"))
+            img_copy = flat
+        # Save to cache as WEBP: small files that decode much faster than PNG on warm runs
         try:
-            img_copy.save(thumb_path, format="PNG")
+            img_copy.save(_thumb_path(url, thumb_px), format="WEBP", quality=85, method=0)
         except Exception:
             pass
         return img_copy
@@ -286,19 +369,88 @@ def fetch_thumbnail(url: str, thumb_px: int = 128) -> Optional[Image.Image]:  #
         return None
 
 
+@functools.lru_cache(maxsize=4096)
+def get_thumbnail(url: str, thumb_px: int = 128) -> Optional[Image.Image]:  # type: ignore[name-defined]
+    # Decoded thumbnails are memoized per (url, size): each image is decoded once per run
+    if not Image:
+        return None
+    thumb_path = _thumb_path(url, thumb_px)
+    # Return cached thumbnail if present
+    if os.path.exists(thumb_path):
+        try:
+            # Cached files are written as RGB, so no conversion is needed on this path.
+            # load() decodes now and releases the file handle (the image outlives this call).
+            img = Image.open(thumb_path)
+            img.load()
+            return img if img.mode in ("RGB", "L") else img.convert("RGB")
+        except Exception:
+            try:
+                os.remove(thumb_path)
+            except Exception:
+                pass
+    return _download_thumbnail(url, thumb_px)
+
+
+# ReportLab readers built once per thumbnail URL / QR payload and reused for every draw.
+# ImageReader wraps the PIL image directly, so nothing is re-encoded to PNG per cell.
+_IMAGE_READER_CACHE: Dict[Tuple[str, int], Optional[ImageReader]] = {}
+_QR_READER_CACHE: Dict[str, Optional[ImageReader]] = {}
+
+
+def get_image_reader(url: str, thumb_px: int = 128) -> Optional[ImageReader]:
+    key = (url, thumb_px)
+    if key not in _IMAGE_READER_CACHE:
+        img = get_thumbnail(url, thumb_px)
+        _IMAGE_READER_CACHE[key] = ImageReader(img) if img is not None else None
+    return _IMAGE_READER_CACHE[key]
+
+
+def _get_qr_reader(data: str) -> Optional[ImageReader]:
+    if data not in _QR_READER_CACHE:
+        img = make_qr_image(data)
+        _QR_READER_CACHE[data] = ImageReader(img) if img is not None else None
+    return _QR_READER_CACHE[data]
+
+
+def prefetch_thumbnails(totes: Dict[str, Tote], thumb_px: int = 128, max_workers: int = 16):
+    # Download all uncached thumbnails concurrently so drawing only hits the disk cache
+    if not Image:
+        return
+    urls = {item.image_url for t in totes.values() for item in t.items if item.image_url}
+    missing = [u for u in urls if not os.path.exists(_thumb_path(u, thumb_px))]
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_download_thumbnail, u, thumb_px) for u in missing]
+        for _ in as_completed(futures):
+            pass
+
+
+@functools.lru_cache(maxsize=8192)
+def string_width(text: str, font_name: str, font_size: float) -> float:
+    # Memoized pdfmetrics.stringWidth; words and labels repeat a lot across totes
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
 def wrap_text(text: str, max_width: float, font_name: str, font_size: int) -> List[str]:
-    # simple word-wrap using ReportLab metrics
+    # simple word-wrap using ReportLab metrics; line width is accumulated word by word
+    # (glyph widths are additive) instead of re-measuring the whole candidate line
     words = text.split()
     lines: List[str] = []
     cur: List[str] = []
+    cur_w = 0.0
+    space_w = string_width(" ", font_name, font_size)
     for w in words:
-        candidate = (" ".join(cur + [w])).strip()
-        if pdfmetrics.stringWidth(candidate, font_name, font_size) <= max_width:
+        w_w = string_width(w, font_name, font_size)
+        extra = (space_w + w_w) if cur else w_w
+        if cur_w + extra <= max_width:
             cur.append(w)
+            cur_w += extra
         else:
             if cur:
                 lines.append(" ".join(cur))
             cur = [w]
+            cur_w = w_w
     if cur:
         lines.append(" ".join(cur))
     if not lines:
@@ -306,6 +458,79 @@ def wrap_text(text: str, max_width: float, font_name: str, font_size: int) -> Li
     return lines
 
 
+@functools.lru_cache(maxsize=16384)
+def _wrap_cached(text: str, max_width_q: float, font_name: str, font_size: int) -> Tuple[str, ...]:
+    return tuple(wrap_text(text, max_width_q, font_name, font_size))
+
+
+def wrap_lines(text: str, max_width: float, font_name: str, font_size: int) -> Tuple[str, ...]:
+    # Memoized wrap_text: item titles and descriptions repeat across totes at the same widths.
+    # Widths are rounded to 0.1pt so float jitter does not defeat the cache.
+    return _wrap_cached(text, round(max_width, 1), font_name, font_size)
+
+
+# Item grid cell metrics shared by layout and drawing
+CELL_PAD = 4
+THUMB_SIZE = 0.7 * inch
+
+
+@dataclass(frozen=True)
+class CellLayout:
+    thumb: Optional[ImageReader]
+    title_lines: Tuple[str, ...]
+    desc_lines: Tuple[str, ...]
+    cell_h: float
+
+
+def _item_title_text(item: ToteItem) -> str:
+    return f"{item.quantity} × {item.title}" if item.title else f"{item.quantity} × (untitled)"
+
+
+def ellipsize(text: str, max_w: float, font: str, size: int) -> str:
+    full_w = pdfmetrics.stringWidth(text, font, size)
+    if full_w <= max_w:
+        return text
+    ell = "…"
+
+    def fits(n: int) -> bool:
+        return pdfmetrics.stringWidth(text[:n] + ell, font, size) <= max_w
+
+    # Start from a proportional estimate of how many characters fit, then step towards the
+    # longest prefix that still fits with the ellipsis (usually only a couple of probes)
+    n = int(len(text) * max(max_w - string_width(ell, font, size), 0) / full_w)
+    n = max(min(n, len(text) - 1), 0)
+    if fits(n):
+        while n + 1 < len(text) and fits(n + 1):
+            n += 1
+    else:
+        while n > 0 and not fits(n):
+            n -= 1
+    return text[:n] + ell
+
+
+@functools.lru_cache(maxsize=4096)
+def compute_layout(item: ToteItem, col_w: float, font_name: str) -> CellLayout:
+    # Thumbnail grid cell: optional image, wrapped quantity × title, wrapped grey description
+    text_w = col_w - 2 * CELL_PAD
+    thumb = get_image_reader(item.image_url) if item.image_url else None
+    desc_text = (item.description or "").strip()
+    title_lines = wrap_lines(_item_title_text(item), text_w, font_name, 10)
+    desc_lines = wrap_lines(desc_text, text_w, font_name, 9) if desc_text else ()
+    text_h = len(title_lines) * 11 + len(desc_lines) * 10
+    img_space = (THUMB_SIZE + 4) if thumb is not None else 0
+    return CellLayout(thumb, title_lines, desc_lines, CELL_PAD + img_space + text_h + CELL_PAD)
+
+
+@functools.lru_cache(maxsize=4096)
+def compute_text_layout(item: ToteItem, col_w: float, font_name: str) -> CellLayout:
+    # Compact text cell: one ellipsized title row and an optional ellipsized description row
+    text_w = col_w - 2 * CELL_PAD
+    desc_text = (item.description or "").strip()
+    title_line = ellipsize(_item_title_text(item), text_w, font_name, 10)
+    desc_lines = (ellipsize(desc_text, text_w, font_name, 9),) if desc_text else ()
+    return CellLayout(None, (title_line,), desc_lines, CELL_PAD + 11 + len(desc_lines) * 10 + CELL_PAD)
+
+
 def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes_map: Optional[Dict[str, Tote]] = None, render_mode: str = "thumbs"):
     width, height = page_size
     content_width = width - 2 * margin
@@ -320,12 +545,9 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
     qr_side = 1.5 * inch
     qr_drawn = False
     if tote.qrdata:
-        img = make_qr_image(tote.qrdata)
-        if img is not None:
-            bio = io.BytesIO()
-            img.save(bio, format="PNG")
-            bio.seek(0)
-            c.drawImage(ImageReader(bio), width - margin - qr_side, y - qr_side, qr_side, qr_side)
+        qr_reader = _get_qr_reader(tote.qrdata)
+        if qr_reader is not None:
+            c.drawImage(qr_reader, width - margin - qr_side, y - qr_side, qr_side, qr_side)
             qr_drawn = True
 
     # Compute available width to avoid overlapping the QR
@@ -335,7 +557,7 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
     # Title first (large), wrapped if needed
     c.setFont(font_bold, 24)
     title = tote.title or "(Untitled tote)"
-    title_lines = wrap_text(title, avail_width, font_bold, 24)
+    title_lines = wrap_lines(title, avail_width, font_bold, 24)
     for line in title_lines:
         c.drawString(margin, y - 10, line)
         y -= 26
@@ -343,7 +565,7 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
     # Then Tote ID (smaller)
     c.setFont(font_bold, 16)
     tote_id_text = f"Tote: {tote.tote_id}"
-    id_lines = wrap_text(tote_id_text, avail_width, font_bold, 16)
+    id_lines = wrap_lines(tote_id_text, avail_width, font_bold, 16)
     for line in id_lines:
         c.drawString(margin, y, line)
         y -= 18
@@ -353,7 +575,7 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
         c.setFont(font_body, 10)
         c.setFillColor(colors.grey)
         loc_text = f"Location: {tote.location}"
-        loc_lines = wrap_text(loc_text, avail_width, font_body, 10)
+        loc_lines = wrap_lines(loc_text, avail_width, font_body, 10)
         for line in loc_lines:
             c.drawString(margin, y, line)
             y -= 14
@@ -376,7 +598,7 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
             if totes_map and child_id in totes_map:
                 child_title = totes_map[child_id].title or ""
             line = f"• {child_id}" + (f" — {child_title}" if child_title else "")
-            for wrapped in wrap_text(line, avail_width, font_body, 10):
+            for wrapped in wrap_lines(line, avail_width, font_body, 10):
                 c.drawString(margin + 12, y, wrapped)
                 y -= 12
     # Extra spacing before Items section to avoid crowding
@@ -390,26 +612,39 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
     c.setFont(font_body, 10)
     # Shared layout values and helpers
     gutter = 0.15 * inch
-    pad = 4
+    pad = CELL_PAD
     max_y = margin + 24
     qr_bottom_y = (top_y0 - qr_side) if qr_drawn else None
 
-    def ellipsize(text: str, max_w: float, font: str, size: int) -> str:
-        if pdfmetrics.stringWidth(text, font, size) <= max_w:
-            return text
-        ell = "…"
-        lo, hi = 0, len(text)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if pdfmetrics.stringWidth(text[:mid] + ell, font, size) <= max_w:
-                lo = mid + 1
-            else:
-                hi = mid
-        return text[: max(lo - 1, 0)] + ell
+    def start_continuation_page():
+        nonlocal y
+        c.showPage()
+        y = height - margin
+        c.setFont(font_bold, 16)
+        c.drawString(margin, y, f"Tote {tote.tote_id} (cont.)")
+        y -= 22
+        c.setFont(font_body, 10)
 
-    def render_items_grid_thumbs(items: List[ToteItem]):
+    def draw_cell(layout: CellLayout, x_left: float, y_top: float):
+        y_cursor = y_top - pad
+        if layout.thumb is not None:
+            c.drawImage(layout.thumb, x_left + pad, y_cursor - THUMB_SIZE, THUMB_SIZE, THUMB_SIZE, preserveAspectRatio=True, mask=None)
+            y_cursor -= (THUMB_SIZE + 4)
+        c.setFillColor(colors.black)
+        c.setFont(font_body, 10)
+        for line in layout.title_lines:
+            c.drawString(x_left + pad, y_cursor - 10, line)
+            y_cursor -= 11
+        if layout.desc_lines:
+            c.setFillColor(colors.grey)
+            c.setFont(font_body, 9)
+            for line in layout.desc_lines:
+                c.drawString(x_left + pad, y_cursor - 9, line)
+                y_cursor -= 10
+            c.setFillColor(colors.black)
+
+    def render_items_grid(items: List[ToteItem], cols: int, layout_fn):
         nonlocal y
-        cols = 5
         if not items:
             c.drawString(margin + 12, y, "(No items recorded)")
             y -= 14
@@ -419,123 +654,22 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
             row_items = items[i : i + cols]
             row_available_width = content_width - (qr_side + 0.25 * inch) if (qr_bottom_y is not None and y > qr_bottom_y) else content_width
             col_width = (row_available_width - gutter * (cols - 1)) / cols
-
-            def measure_cell(item, col_w: float) -> float:
-                thumb_img = fetch_thumbnail(item.image_url) if item.image_url else None
-                thumb_h = 0.7 * inch if thumb_img is not None else 0.0
-                title_text = f"{item.quantity} × {item.title}" if item.title else f"{item.quantity} × (untitled)"
-                desc_text = (item.description or "").strip()
-                title_lines = wrap_text(title_text, col_w - 2 * pad, font_body, 10)
-                desc_lines = wrap_text(desc_text, col_w - 2 * pad, font_body, 9) if desc_text else []
-                text_h = len(title_lines) * 11 + (len(desc_lines) * 10 if desc_lines else 0)
-                img_space = (thumb_h + 4) if thumb_h else 0
-                return pad + img_space + text_h + pad
-
-            def draw_cell(item, x_left: float, y_top: float, col_w: float) -> float:
-                thumb_img = fetch_thumbnail(item.image_url) if item.image_url else None
-                thumb_h = 0.7 * inch if thumb_img is not None else 0.0
-                thumb_w = thumb_h if thumb_h else 0.0
-                title_text = f"{item.quantity} × {item.title}" if item.title else f"{item.quantity} × (untitled)"
-                desc_text = (item.description or "").strip()
-                title_lines = wrap_text(title_text, col_w - 2 * pad, font_body, 10)
-                desc_lines = wrap_text(desc_text, col_w - 2 * pad, font_body, 9) if desc_text else []
-                text_h = len(title_lines) * 11 + (len(desc_lines) * 10 if desc_lines else 0)
-                img_space = (thumb_h + 4) if thumb_h else 0
-                cell_h = pad + img_space + text_h + pad
-                y_cursor = y_top - pad
-                if thumb_img is not None:
-                    bio = io.BytesIO()
-                    thumb_img.save(bio, format="PNG")
-                    bio.seek(0)
-                    c.drawImage(ImageReader(bio), x_left + pad, y_cursor - thumb_h, thumb_w, thumb_h, preserveAspectRatio=True, mask=None)
-                    y_cursor -= (thumb_h + 4)
-                c.setFillColor(colors.black)
-                c.setFont(font_body, 10)
-                for line in title_lines:
-                    c.drawString(x_left + pad, y_cursor - 10, line)
-                    y_cursor -= 11
-                if desc_lines:
-                    c.setFillColor(colors.grey)
-                    c.setFont(font_body, 9)
-                    for line in desc_lines:
-                        c.drawString(x_left + pad, y_cursor - 9, line)
-                        y_cursor -= 10
-                    c.setFillColor(colors.black)
-                return cell_h
-
-            row_heights = [measure_cell(it, col_width) for it in row_items]
-            row_h = max(row_heights) if row_heights else 0
+            # Layouts are cached per item and column width (rounded to collapse float noise)
+            row_layouts = [layout_fn(it, round(col_width, 1), font_body) for it in row_items]
+            row_h = max(lay.cell_h for lay in row_layouts)
             if y - row_h < max_y:
-                c.showPage()
-                y = height - margin
-                c.setFont(font_bold, 16)
-                c.drawString(margin, y, f"Tote {tote.tote_id} (cont.)")
-                y -= 22
-                c.setFont(font_body, 10)
-            for col_idx, it in enumerate(row_items):
+                start_continuation_page()
+            for col_idx, lay in enumerate(row_layouts):
                 x_left = margin + col_idx * (col_width + gutter)
-                draw_cell(it, x_left, y, col_width)
+                draw_cell(lay, x_left, y)
             y -= (row_h + 6)
             i += cols
 
-    def render_items_grid_text(items: List[ToteItem]):
-        nonlocal y
-        cols = 4
-        if not items:
-            c.drawString(margin + 12, y, "(No items recorded)")
-            y -= 14
-            return
-        i = 0
-        title_size = 10
-        desc_size = 9
-        while i < len(items):
-            row_items = items[i : i + cols]
-            row_available_width = content_width - (qr_side + 0.25 * inch) if (qr_bottom_y is not None and y > qr_bottom_y) else content_width
-            col_width = (row_available_width - gutter * (cols - 1)) / cols
+    def render_items_grid_thumbs(items: List[ToteItem]):
+        render_items_grid(items, 5, compute_layout)
 
-            def measure_cell_text(item, col_w: float) -> float:
-                text_w = col_w - 2 * pad
-                title_text = f"{item.quantity} × {item.title}" if item.title else f"{item.quantity} × (untitled)"
-                title_line = ellipsize(title_text, text_w, font_body, title_size)
-                desc_text = (item.description or "").strip()
-                desc_line = ellipsize(desc_text, text_w, font_body, desc_size) if desc_text else ""
-                lines_h = 11 + (10 if desc_line else 0)
-                return pad + lines_h + pad
-
-            def draw_cell_text(item, x_left: float, y_top: float, col_w: float) -> float:
-                text_w = col_w - 2 * pad
-                title_text = f"{item.quantity} × {item.title}" if item.title else f"{item.quantity} × (untitled)"
-                title_line = ellipsize(title_text, text_w, font_body, title_size)
-                desc_text = (item.description or "").strip()
-                desc_line = ellipsize(desc_text, text_w, font_body, desc_size) if desc_text else ""
-                cell_h = pad + (11 + (10 if desc_line else 0)) + pad
-                y_cursor = y_top - pad
-                c.setFillColor(colors.black)
-                c.setFont(font_body, title_size)
-                c.drawString(x_left + pad, y_cursor - 10, title_line)
-                y_cursor -= 11
-                if desc_line:
-                    c.setFillColor(colors.grey)
-                    c.setFont(font_body, desc_size)
-                    c.drawString(x_left + pad, y_cursor - 9, desc_line)
-                    y_cursor -= 10
-                    c.setFillColor(colors.black)
-                return cell_h
-
-            row_heights = [measure_cell_text(it, col_width) for it in row_items]
-            row_h = max(row_heights) if row_heights else 0
-            if y - row_h < max_y:
-                c.showPage()
-                y = height - margin
-                c.setFont(font_bold, 16)
-                c.drawString(margin, y, f"Tote {tote.tote_id} (cont.)")
-                y -= 22
-                c.setFont(font_body, 10)
-            for col_idx, it in enumerate(row_items):
-                x_left = margin + col_idx * (col_width + gutter)
-                draw_cell_text(it, x_left, y, col_width)
-            y -= (row_h + 6)
-            i += cols
+    def render_items_grid_text(items: List[ToteItem]):
+        render_items_grid(items, 4, compute_text_layout)
 
     # Render this tote's items based on selected mode
     if render_mode == "text":
@@ -576,16 +710,71 @@ def draw_label(c: canvas.Canvas, tote: Tote, page_size, margin=0.5 * inch, totes
     c.showPage()
 
 
-def generate_pdf(totes: Dict[str, Tote], output_path: str, page: str = "letter", render_mode: str = "thumbs"):
-    page_size = letter if page.lower() == "letter" else A4
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    c = canvas.Canvas(output_path, pagesize=page_size)
+def _tote_snapshot(totes: Dict[str, Tote], tote_id: str) -> Dict[str, Tote]:
+    # The tote plus its direct children: everything draw_label reads from totes_map
+    tote = totes[tote_id]
+    snapshot = {tote_id: tote}
+    for child_id in tote.children:
+        if child_id in totes:
+            snapshot[child_id] = totes[child_id]
+    return snapshot
 
-    # Stable order by tote id
-    for tote_id in sorted(totes.keys()):
-        draw_label(c, totes[tote_id], page_size, totes_map=totes, render_mode=render_mode)
 
+def render_tote_pdf(tote_id: str, totes_map: Dict[str, Tote], page_size, render_mode: str = "thumbs") -> bytes:
+    # Render a single tote label (all of its pages) into a standalone PDF
+    bio = io.BytesIO()
+    c = canvas.Canvas(bio, pagesize=page_size)
+    draw_label(c, totes_map[tote_id], page_size, totes_map=totes_map, render_mode=render_mode)
     c.save()
+    return bio.getvalue()
+
+
+def _render_tote_job(job: Tuple[str, Dict[str, Tote], Tuple[float, float], Tuple[str, ...]]) -> List[bytes]:
+    tote_id, totes_map, page_size, render_modes = job
+    return [render_tote_pdf(tote_id, totes_map, page_size, mode) for mode in render_modes]
+
+
+def generate_pdfs(totes: Dict[str, Tote], outputs: List[Tuple[str, str]], page: str = "letter", jobs: int = 1, sort: str = "id"):
+    # Write one PDF per (output_path, render_mode) from a single pass over the totes, so the
+    # layout/wrap/thumbnail caches stay hot between variants of the same label
+    page_size = letter if page.lower() == "letter" else A4
+    for output_path, _ in outputs:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    render_modes = tuple(mode for _, mode in outputs)
+    # Warm the thumbnail cache first so drawing (in this process or in workers) never downloads
+    if any(mode != "text" for mode in render_modes):
+        prefetch_thumbnails(totes)
+
+    # Stable order by tote id, or the order totes first appear in the input (no sort needed)
+    order = sorted(totes) if sort == "id" else list(totes)
+
+    if jobs > 1 and PdfWriter is not None:
+        # Render each tote into its own PDF(s) in worker processes, then stitch them in order
+        job_args = [(tote_id, _tote_snapshot(totes, tote_id), page_size, render_modes) for tote_id in order]
+        with multiprocessing.Pool(jobs) as pool:
+            parts = pool.map(_render_tote_job, job_args, chunksize=max(1, len(job_args) // (jobs * 4)))
+        for idx, (output_path, _) in enumerate(outputs):
+            writer = PdfWriter()
+            for tote_parts in parts:
+                writer.append(io.BytesIO(tote_parts[idx]))
+            # Each part embeds its own copy of shared images and fonts; fold the duplicates
+            if hasattr(writer, "compress_identical_objects"):
+                writer.compress_identical_objects()
+            with open(output_path, "wb") as f:
+                writer.write(f)
+        return
+
+    canvases = [(canvas.Canvas(output_path, pagesize=page_size), mode) for output_path, mode in outputs]
+    for tote_id in order:
+        for c, mode in canvases:
+            draw_label(c, totes[tote_id], page_size, totes_map=totes, render_mode=mode)
+
+    for c, _ in canvases:
+        c.save()
+
+
+def generate_pdf(totes: Dict[str, Tote], output_path: str, page: str = "letter", render_mode: str = "thumbs", jobs: int = 1, sort: str = "id"):
+    generate_pdfs(totes, [(output_path, render_mode)], page=page, jobs=jobs, sort=sort)
 
 
 def collect_input_paths(input_path: str) -> List[str]:
@@ -608,6 +797,8 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p.add_argument("-o", "--output", default=os.path.join("output", "labels.pdf"), help="Output PDF path or base (default: output/labels.pdf). With --mode both, writes *_thumbs.pdf and *_text.pdf")
     p.add_argument("--page", choices=["letter", "A4"], default="letter", help="Page size (default: letter)")
     p.add_argument("--mode", choices=["thumbs", "text", "both"], default="both", help="Render thumbnails, text-only (2 rows), or both (default: both)")
+    p.add_argument("--sort", choices=["id", "input"], default="id", help="Label order: by tote ID, or as first seen in the input CSVs (default: id)")
+    p.add_argument("-j", "--jobs", type=int, default=1, help="Render totes in N parallel processes (requires pypdf; default: 1)")
     return p.parse_args(argv)
 
 
@@ -624,22 +815,19 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("No totes found in input.")
         return 1
 
+    if args.jobs > 1 and PdfWriter is None:
+        print("Note: pypdf is not installed; rendering with a single process.")
+
     try:
         if args.mode == "both":
             base, ext = os.path.splitext(args.output)
             ext = ext or ".pdf"
-            thumbs_path = f"{base}_thumbs{ext}"
-            text_path = f"{base}_text{ext}"
-            generate_pdf(totes, thumbs_path, page=args.page, render_mode="thumbs")
-            generate_pdf(totes, text_path, page=args.page, render_mode="text")
-            print(f"Wrote labels (thumbs) for {len(totes)} totes to {thumbs_path}")
-            print(f"Wrote labels (text) for {len(totes)} totes to {text_path}")
-        elif args.mode == "thumbs":
-            generate_pdf(totes, args.output, page=args.page, render_mode="thumbs")
-            print(f"Wrote labels (thumbs) for {len(totes)} totes to {args.output}")
+            outputs = [(f"{base}_thumbs{ext}", "thumbs"), (f"{base}_text{ext}", "text")]
         else:
-            generate_pdf(totes, args.output, page=args.page, render_mode="text")
-            print(f"Wrote labels (text) for {len(totes)} totes to {args.output}")
+            outputs = [(args.output, args.mode)]
+        generate_pdfs(totes, outputs, page=args.page, jobs=args.jobs, sort=args.sort)
+        for output_path, mode in outputs:
+            print(f"Wrote labels ({mode}) for {len(totes)} totes to {output_path}")
     except Exception as e:
         print(f"Failed to generate PDF: {e}")
         return 3